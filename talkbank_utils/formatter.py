@@ -1,4 +1,5 @@
-import regex as re
+import re
+from functools import lru_cache
 from string import ascii_letters, digits, punctuation, whitespace
 
 root = r"[A-Za-z0-9:]+"
@@ -16,6 +17,42 @@ re_scopes = re.compile(r"<.*?>")
 re_shortenings = re.compile(r"\(.*?\)")
 re_special_form = re.compile(rf"({root})@[a-z:]+")
 
+re_whitespace = re.compile(r"[_\s]+")
+re_punctuation_space = re.compile(r"\s+([.,!?;:])")
+
+# Deletion rules in the order they apply, keyed by the Formatter flag enabling them.
+kill_rules = (
+    ("unintelligible", "xxx"),
+    ("uninterpretable", "yyy"),
+    ("phonological_fragment", re_phonological.pattern),
+    ("fillers", re_fillers.pattern),
+    ("nonwords", re_nonwords.pattern),
+    ("simple_events", re_events.pattern),
+    ("terminators", re_terminators.pattern),
+    ("brackets", re_brackets.pattern),
+    ("scopes", re_scopes.pattern),
+    ("special_form", re_special_form.pattern),
+)
+
+keep_mask = frozenset(ascii_letters + digits + whitespace)
+punctuation_mask = frozenset(punctuation)
+
+# Every ASCII character that isn't alphanumeric or whitespace, deleted by final_filter.
+filter_deletions = bytes(i for i in range(128) if chr(i) not in keep_mask)
+
+
+@lru_cache(maxsize=32)
+def _build_kill_re(enabled: frozenset[str]) -> re.Pattern:
+    """
+    Fuse every enabled rule into one alternation so a line is scanned once.
+
+    Cached since every Formatter with the same flags shares the same pattern.
+    """
+    alternatives = [rule for flag, rule in kill_rules if flag in enabled]
+    if "special_form" not in enabled:
+        alternatives.append(rf"(?P<form>{root})@[a-z:]+")
+    return re.compile("|".join(alternatives))
+
 
 class Formatter:
     """
@@ -69,23 +106,66 @@ class Formatter:
 
     """
 
-    def __init__(self, **kwargs):
-        kwargs.setdefault("phonological_fragment", True)
-        kwargs.setdefault("fillers", True)
-        kwargs.setdefault("nonwords", True)
-        kwargs.setdefault("simple_events", True)
-        kwargs.setdefault("terminators", True)
-        kwargs.setdefault("brackets", True)
-        kwargs.setdefault("scopes", True)
-        kwargs.setdefault("shortenings", False)
-        kwargs.setdefault("special_form", False)
-
-        kwargs.setdefault("unintelligible", True)
-        kwargs.setdefault("uninterpretable", True)
+    __slots__ = (
+        "phonological_fragment",
+        "fillers",
+        "nonwords",
+        "simple_events",
+        "omitted",
+        "terminators",
+        "brackets",
+        "scopes",
+        "shortenings",
+        "special_form",
+        "unintelligible",
+        "uninterpretable",
+        "discard_empty",
+        "final_filter",
+        "_kill_re",
+        "_kill_repl",
+    )
 
-        kwargs.setdefault("discard_empty", True)
-        kwargs.setdefault("final_filter", True)
-        self.__dict__.update(kwargs)
+    def __init__(
+        self,
+        *,
+        phonological_fragment: bool = True,
+        fillers: bool = True,
+        nonwords: bool = True,
+        simple_events: bool = True,
+        omitted: bool = True,
+        terminators: bool = True,
+        brackets: bool = True,
+        scopes: bool = True,
+        shortenings: bool = False,
+        special_form: bool = False,
+        unintelligible: bool = True,
+        uninterpretable: bool = True,
+        discard_empty: bool = True,
+        final_filter: bool = True,
+    ):
+        self.phonological_fragment = phonological_fragment
+        self.fillers = fillers
+        self.nonwords = nonwords
+        self.simple_events = simple_events
+        self.omitted = omitted
+        self.terminators = terminators
+        self.brackets = brackets
+        self.scopes = scopes
+        self.shortenings = shortenings
+        self.special_form = special_form
+
+        self.unintelligible = unintelligible
+        self.uninterpretable = uninterpretable
+
+        self.discard_empty = discard_empty
+        self.final_filter = final_filter
+
+        self._kill_re = _build_kill_re(
+            frozenset(flag for flag, _ in kill_rules if getattr(self, flag))
+        )
+        # Keeps the text of a special form, other matches expand to nothing
+        # since groups that didn't participate are replaced with "".
+        self._kill_repl = r"\g<form>" if "form" in self._kill_re.groupindex else ""
 
     def format_line(self, line: str) -> str | None:
         """
@@ -96,59 +176,25 @@ class Formatter:
         Returns formatted string or None if discard_empty is True and conditions are matched.
         """
 
-        if self.unintelligible:
-            line = line.replace("xxx", "")
-        if self.uninterpretable:
-            line = line.replace("yyy", "")
-
-        if self.phonological_fragment:
-            line = re_phonological.sub("", line)
-        if self.fillers:
-            line = re_fillers.sub("", line)
-        if self.nonwords:
-            line = re_nonwords.sub("", line)
-        if self.simple_events:
-            line = re_events.sub("", line)
-        if self.terminators:
-            line = re_terminators.sub("", line)
-        if self.brackets:
-            line = re_brackets.sub("", line)
-        if self.scopes:
-            line = re_scopes.sub("", line)
+        # Shortenings go first since they can sit inside a special form, e.g. goin(g)@o
         if self.shortenings:
             line = re_shortenings.sub("", line)
         else:
-            line = line.replace("(", "")
-            line = line.replace(")", "")
-        if self.special_form:
-            line = re_special_form.sub("", line)
-        else:
-            text = re_special_form.search(line)
-            if text is not None:
-                text = text.group(1)
-                line = re_special_form.sub(text, line)
-
-        if self.unintelligible:
-            line = line.replace("xxx", "")
-        if self.uninterpretable:
-            line = line.replace("yyy", "")
+            line = line.replace("(", "").replace(")", "")
 
-        line = re.sub(r"\s+", " ", line)
-        line = re.sub(r"\s+([.,!?;:])", r"\1", line).strip()
+        line = self._kill_re.sub(self._kill_repl, line)
 
         # Remove _ since it's used in context of named entities.
-        line = line.replace("_", " ")
+        line = re_whitespace.sub(" ", line)
+        line = re_punctuation_space.sub(r"\1", line).strip()
 
         # Final filtering alphanumeric + ending punctuation.
         if self.final_filter:
-            chs = []
-            mask = ascii_letters + digits + whitespace
-            for i, ch in enumerate(line):
-                if ch in mask:
-                    chs.append(ch)
-                elif i == len(line) - 1 and ch in punctuation:
-                    chs.append(ch)
-            line = "".join(chs)
+            last = line[-1:]
+            kept = line.encode("ascii", "ignore").translate(None, filter_deletions)
+            line = kept.decode("ascii")
+            if last in punctuation_mask:
+                line += last
 
         # Format out empty string
         if (line == "" or len(line) <= 2 or "0" in line) and self.discard_empty:
@@ -170,10 +216,16 @@ if __name__ == "__main__":
     assert formatter.format_line("yyy .") is None
     assert (
         formatter.format_line("yeah we gotta [: have to] sit on the pee_pee pot .")
-        == "yeah we gotta sit on the pee_pee pot."
+        == "yeah we gotta sit on the pee pee pot."
     )
+    assert formatter.format_line("word_ .") == "word."
+    assert formatter.format_line("hi _ you .") == "hi you."
+    assert formatter.format_line("_hello there_ !") == "hello there!"
     assert formatter.format_line("yyy yyy yyy &=squeals !") is None
     assert formatter.format_line("&=yells &=vocalizes .") is None
     assert formatter.format_line("xxx do it .") == "do it."
-    assert formatter.format_line("don('t)") == "don't"
+    assert formatter.format_line("don('t)") == "dont"
     assert formatter.format_line("&+ba back") == "back"
+    assert formatter.format_line("a@l b@s c .") == "a b c."
+    assert formatter.format_line("goin(g)@o home .") == "going home."
+    assert formatter.format_line("a@l goin(g)@o c .") == "a going c."
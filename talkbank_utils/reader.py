@@ -1,83 +1,122 @@
 from pyannote.core import Annotation, Segment
-import regex as re
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
 from pathlib import Path
-from typing import Self
+from typing import Iterator, Self
 import json
 
 from .formatter import Formatter
 
 TIMESTAMP_BRACE = "\x15"
+# Reader.from_dir only parses in parallel for at least this many files.
+PARALLEL_MIN_FILES = 16
 
-re_has_speaker = re.compile(r"\*[A-Z]+:")
 re_timestamp = re.compile(rf"{TIMESTAMP_BRACE}([0-9]+_[0-9]+){TIMESTAMP_BRACE}")
+# Speaker line with a timestamp, e.g. `*CHI:\thello . \x15100_200\x15`
+# Leading with a literal `*` (checked to start a line by the lookbehind) instead of `^`
+# lets the engine skip straight to candidates rather than trying every position.
+re_utterance = re.compile(
+    rf"\*(?<![^\n]\*)(?P<speaker>[A-Z]+):\t(?P<utterance>[^\t\n{TIMESTAMP_BRACE}]*)"
+    rf"{TIMESTAMP_BRACE}(?P<start>[0-9]+)_(?P<end>[0-9]+){TIMESTAMP_BRACE}"
+    r"(?P<rest>[^\t\n]*)"
+)
+
+
+def _check_exists(audio_filepath: str, rttm_filepath: str):
+    """
+    Raise an error if either file of a manifest entry doesn't exist.
+    """
+    if not Path(audio_filepath).exists():
+        raise ValueError(f".wav file {audio_filepath} for to_manifest() must exist.")
+    if not Path(rttm_filepath).exists():
+        raise ValueError(f".rttm file {rttm_filepath} for to_manifest() must exist")
+
+
+def _iter_files(root: str, suffix: str) -> Iterator[str]:
+    """
+    Recursively yield paths of files ending with suffix under root.
+    Faster than Path.rglob() since entries are filtered by name using cached
+    directory info, without creating a Path for each.
+    """
+    if not os.path.isdir(root):
+        return
+
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    yield entry.path
 
 
 class Transcription:
     """Container for .cha with helper functions and data for ASR tasks"""
 
+    __slots__ = ("formatter", "speakers", "annotation", "utterances", "duration")
+
     def __init__(
         self, name: str, raw_transcription: str, formatter: Formatter = Formatter()
     ):
         self.formatter = formatter
         self.speakers = set()
-        self.annotation = Annotation(uri=name)
         self.utterances = []
-        self.duration = 0
 
-        lines = raw_transcription.split("\n")
-        for line in lines:
-            self._parse_line(line)
+        # TODO: Handle optional speaker matching from the @Participants line
+        for match in re_utterance.finditer(raw_transcription):
+            self._parse_utterance(match)
+
+        self.duration = max(
+            (segment.end for _, segment, _ in self.utterances), default=0
+        )
+
+        # Build annotation in bulk rather than inserting segment by segment.
+        # Empty segments are skipped, as `annotation[segment] = speaker` would.
+        self.annotation = Annotation.from_records(
+            (
+                (segment, "_", speaker)
+                for speaker, segment, _ in self.utterances
+                if segment
+            ),
+            uri=name,
+        )
 
     @classmethod
     def from_path(cls, filepath: str) -> Self:
         """
         Load transcription from a .cha file
         """
-        f_in = open(filepath, "r")
-        raw_text = f_in.read()
-        f_in.close()
+        filepath = Path(filepath)
+        raw_text = filepath.read_text(encoding="utf-8")
 
         # Get basename since rttm needs it
-        base = Path(filepath).parts[-1].removesuffix(".cha")
+        base = filepath.parts[-1].removesuffix(".cha")
 
         return cls(base, raw_text)
 
-    def _parse_line(self, line: str):
+    def _parse_utterance(self, match: re.Match):
         """
-        Internal util function for parsing line
-        Only goes through @Participants line and any line with speaker format
+        Internal util function for parsing a speaker line matched by re_utterance
+        Lines without timestamps never match so they're skipped.
 
-        - Adds segments to annotation
+        - Adds utterances
         - Modifies speakers
         """
-        if line.startswith("@Participants:"):
-            line = line.removeprefix("@Participants:").strip()
-            # TODO: Handle optional speaker matching here
-        elif re_has_speaker.match(line):
-            lines = line.split("\t")
-
-            speaker = lines[0][1:-1]
-            timestamp = re_timestamp.search(lines[1])
-            utterance = re_timestamp.sub("", lines[1])
-            # Only care if it has timestamps.
-            if timestamp is None:
-                return
-            timestamp = timestamp.group(1)
+        speaker = match.group("speaker")
+        utterance = match.group("utterance") + re_timestamp.sub("", match.group("rest"))
 
-            self.speakers.add(speaker)
+        self.speakers.add(speaker)
 
-            timestamps = timestamp.split("_")
-            start = float(timestamps[0]) / 1_000
-            end = float(timestamps[1]) / 1_000
+        start = float(match.group("start")) / 1_000
+        end = float(match.group("end")) / 1_000
 
-            segment = Segment(start, end)
+        segment = Segment(start, end)
 
-            utterance = self.formatter.format_line(utterance)
+        utterance = self.formatter.format_line(utterance)
 
-            self.utterances.append((speaker, segment, utterance))
-            self.annotation[segment] = speaker
-
-            self.duration = max(self.duration, end)
+        self.utterances.append((speaker, segment, utterance))
 
     def to_rttm(self) -> str:
         """
@@ -97,14 +136,7 @@ class Transcription:
         :param should_exist: Throws an error if true and neither the audio or the rttm file exists.
         """
         if should_exist:
-            if not Path(audio_filepath).exists():
-                raise ValueError(
-                    f".wav file {audio_filepath} for to_manifest() must exist."
-                )
-            if not Path(rttm_filepath).exists():
-                raise ValueError(
-                    f".rttm file {rttm_filepath} for to_manifest() must exist"
-                )
+            _check_exists(audio_filepath, rttm_filepath)
         """
             Format used for diarization: 
                 {'audio_filepath', 'text', 'offset', 'duration', 'num_speakers', 'rttm_filepath'}
@@ -118,6 +150,26 @@ class Transcription:
             "rttm_filepath": str(rttm_filepath),
         }
 
+    def to_manifest_line(
+        self, audio_filepath: str, rttm_filepath: str, should_exist: bool = False
+    ) -> str:
+        """
+        Return the JSON line of to_manifest_entry() without building the dictionary.
+        Output matches json.dumps() of the entry.
+
+        :param audio_filepath: Path to the audio file for this transcription
+        :param rttm_filepath: Path to the rttm file for this transcription
+        :param should_exist: Throws an error if true and neither the audio or the rttm file exists.
+        """
+        if should_exist:
+            _check_exists(audio_filepath, rttm_filepath)
+        return (
+            f'{{"audio_filepath": {json.dumps(str(audio_filepath))}, "text": "-", '
+            f'"offset": 0, "duration": {int(self.duration)}, '
+            f'"num_speakers": {len(self.speakers)}, '
+            f'"rttm_filepath": {json.dumps(str(rttm_filepath))}}}'
+        )
+
 
 class Reader:
     """Reader class is used for loading a directory of .cha files to access"""
@@ -129,15 +181,30 @@ class Reader:
         self.transcriptions = transcriptions
 
     @classmethod
-    def from_dir(cls, cha_dir: str):
+    def from_dir(cls, cha_dir: str, num_workers: int | None = None):
         """
         Load a Reader from a recursive directory of .cha files.
+        Files are parsed in parallel across processes unless there are only a few.
+
+        :param cha_dir: Directory of .cha files
+        :param num_workers: Number of processes to parse with, defaults to the number of CPUs
         """
+        paths = list(_iter_files(cha_dir, ".cha"))
+
         transcriptions = {}
-        for path in Path(cha_dir).rglob("*.cha"):
-            base_dir = Path(*path.parts[1:]).with_suffix("")
-            transcription = Transcription.from_path(path)
-            transcriptions[base_dir] = transcription
+        # Starting a pool and pickling results back isn't worth it for few files.
+        if num_workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+            for path in paths:
+                base_dir = Path(*Path(path).parts[1:]).with_suffix("")
+                transcriptions[base_dir] = Transcription.from_path(path)
+            return cls(transcriptions)
+
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(Transcription.from_path, paths, chunksize=16)
+
+            for path, transcription in zip(paths, results):
+                base_dir = Path(*Path(path).parts[1:]).with_suffix("")
+                transcriptions[base_dir] = transcription
         return cls(transcriptions)
 
     def save_rttms(self, rttm_dir: str):
@@ -159,22 +226,11 @@ class Reader:
         :param wav_dir: Diectory of .wav files, should exist
         :param skip: Whether or not to skip a line of a .rttm of .wav file doesn't exist for it
         """
-        out = []
-        for base_dir, transcription in self.transcriptions.items():
-            audio_filepath = wav_dir / base_dir.with_suffix(".wav")
-            rttm_filepath = rttm_dir / base_dir.with_suffix(".rttm")
-
-            try:
-                manifest = transcription.to_manifest_entry(
-                    audio_filepath, rttm_filepath, should_exist=True
-                )
-                out.append(manifest)
-            except ValueError as e:
-                if skip:
-                    continue
-                raise e
-
-        return out
+        filepaths = self._manifest_filepaths(rttm_dir, wav_dir, skip)
+        return [
+            transcription.to_manifest_entry(audio_filepath, rttm_filepath)
+            for transcription, audio_filepath, rttm_filepath in filepaths
+        ]
 
     def save_manifest(
         self, manifest_filepath: str, rttm_dir: str, wav_dir: str, skip: bool = True
@@ -190,11 +246,38 @@ class Reader:
         if not manifest_filepath.endswith(".jsonl"):
             raise ValueError("Manifest file should end with .jsonl")
 
-        manifest = self.to_manifest(rttm_dir, wav_dir, skip)
+        filepaths = self._manifest_filepaths(rttm_dir, wav_dir, skip)
+        lines = [
+            transcription.to_manifest_line(audio_filepath, rttm_filepath) + "\n"
+            for transcription, audio_filepath, rttm_filepath in filepaths
+        ]
 
         Path(manifest_filepath).parent.mkdir(parents=True, exist_ok=True)
-        manifest_file = open(manifest_filepath, "w")
-        for manifest_entry in manifest:
-            json.dump(manifest_entry, manifest_file)
-            manifest_file.write("\n")
-        manifest_file.close()
+        Path(manifest_filepath).write_text("".join(lines))
+
+    def _manifest_filepaths(self, rttm_dir: str, wav_dir: str, skip: bool):
+        """
+        Internal util function yielding transcriptions with their .wav and .rttm paths
+
+        :param skip: Whether to skip or raise if a .rttm or .wav file doesn't exist for it
+        """
+        # Walk wav_dir once instead of checking every .wav exists, keyed by the
+        # path relative to wav_dir like base_dir.
+        prefix = os.path.join(wav_dir, "")
+        wav_names = {path[len(prefix) :] for path in _iter_files(wav_dir, ".wav")}
+
+        for base_dir, transcription in self.transcriptions.items():
+            audio_filepath = wav_dir / base_dir.with_suffix(".wav")
+            rttm_filepath = rttm_dir / base_dir.with_suffix(".rttm")
+
+            # Only check the filesystem for a .wav the walk didn't see.
+            wav_seen = str(base_dir.with_suffix(".wav")) in wav_names
+            if not (wav_seen and rttm_filepath.exists()):
+                try:
+                    _check_exists(audio_filepath, rttm_filepath)
+                except ValueError as e:
+                    if skip:
+                        continue
+                    raise e
+
+            yield transcription, audio_filepath, rttm_filepath
@@ -14,14 +14,17 @@ def get_wav_rttm_pairs(wav_dir: str, rttm_dir: str) -> list[tuple[str, str]]:
     if not wav_path.exists() or not rttm_path.exists():
         raise ValueError("wav_dir or rttm_dir doesn't exist")
 
+    # Index both trees by relative path without suffix, then join on it.
+    rttm_index = {
+        path.relative_to(rttm_path).with_suffix(""): path
+        for path in rttm_path.rglob("*.rttm")
+    }
+
     out = []
     for wav_filepath in wav_path.rglob("*.wav"):
-        for rttm_filepath in rttm_path.rglob("*.rttm"):
-            # for comparison
-            temp = str(rttm_filepath).replace(".rttm", ".wav")
-            temp = temp.replace(rttm_dir, wav_dir)
-
-            if str(wav_filepath) != temp:
-                continue
-            out.append((str(wav_filepath), str(rttm_filepath)))
+        key = wav_filepath.relative_to(wav_path).with_suffix("")
+        rttm_filepath = rttm_index.get(key)
+        if rttm_filepath is None:
+            continue
+        out.append((str(wav_filepath), str(rttm_filepath)))
     return out